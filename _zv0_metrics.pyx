@@ -0,0 +1,76 @@
+# cython: language_level=3
+"""Compiled single-pass walker for zv0_agent.
+
+Optional drop-in for CodeAnalyzer._single_pass. Build it next to
+zv0_agent.py with:
+
+    cythonize -i _zv0_metrics.pyx
+
+zv0_agent falls back to its pure-Python walker when it isn't built.
+"""
+
+import ast
+
+cdef object _iter_child_nodes = ast.iter_child_nodes
+cdef type _If = ast.If
+cdef type _BoolOp = ast.BoolOp
+cdef type _For = ast.For
+cdef type _While = ast.While
+cdef type _FunctionDef = ast.FunctionDef
+cdef type _ClassDef = ast.ClassDef
+cdef type _Call = ast.Call
+cdef type _Name = ast.Name
+
+
+cpdef tuple single_pass(object tree, bint security_checks, bint performance_checks,
+                        frozenset dangerous, object loop_issue, object call_issue):
+    """Walk the tree once; same contract as CodeAnalyzer._single_pass.
+
+    Node types are matched by type pointer. loop_issue(line, depth) and
+    call_issue(line, name) build the reported issues.
+    """
+    cdef int complexity = 1
+    cdef int function_count = 0
+    cdef int class_count = 0
+    cdef int depth
+    cdef list issues = []
+    cdef list children
+    # Each entry carries the number of loops enclosing the node
+    cdef list stack = [(tree, 0)]
+    cdef tuple entry
+    cdef object node, func, child
+    cdef type node_type
+
+    while stack:
+        entry = <tuple>stack.pop()
+        node = entry[0]
+        depth = entry[1]
+        node_type = type(node)
+        if node_type is _If:
+            complexity += 1
+        elif node_type is _BoolOp:
+            # Each and/or in a chain is a decision point
+            complexity += len((<object>node).values) - 1
+        elif node_type is _For or node_type is _While:
+            complexity += 1
+            if performance_checks:
+                depth += 1
+                if depth > 2:
+                    issues.append(loop_issue(node.lineno, depth))
+        elif node_type is _FunctionDef:
+            # Loops inside a function body don't nest in the enclosing ones
+            function_count += 1
+            depth = 0
+        elif node_type is _ClassDef:
+            class_count += 1
+        elif node_type is _Call and security_checks:
+            func = node.func
+            if type(func) is _Name and func.id in dangerous:
+                issues.append(call_issue(node.lineno, func.id))
+
+        # Push children in reverse so they pop in source order
+        children = [(child, depth) for child in _iter_child_nodes(node)]
+        children.reverse()
+        stack.extend(children)
+
+    return complexity, function_count, class_count, issues
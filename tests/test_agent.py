@@ -0,0 +1,91 @@
+"""Tests for ZV0Agent: batch analysis and config loading."""
+
+from pathlib import Path
+
+import pytest
+
+import zv0_agent
+from zv0_agent import ZV0Agent
+
+SHIPPED_CONFIG = Path(zv0_agent.__file__).with_name("zv0.toml")
+
+
+@pytest.fixture
+def agent(tmp_path):
+    return ZV0Agent(cache_path=str(tmp_path / "reports.db"))
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for name, code in [("a.py", "eval('1')\n"), ("b.py", "x = 1\n" * 300),
+                       ("c.py", "def (\n")]:
+        path = tmp_path / name
+        path.write_text(code)
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.py"))
+    return paths
+
+
+def test_analyze_files_matches_analyze_file(agent, sources):
+    results = agent.analyze_files(sources)
+
+    assert results == {path: agent.analyze_file(path) for path in sources}
+    assert results[sources[-1]]["success"] is False
+
+
+def test_analyze_files_with_fewer_paths_than_workers(agent, sources):
+    results = agent.analyze_files(sources[:2], max_workers=8)
+
+    assert list(results) == sources[:2]
+    assert all(result["success"] for result in results.values())
+
+
+def test_analyze_files_empty(agent):
+    assert agent.analyze_files([]) == {}
+
+
+def test_shipped_config_matches_defaults():
+    defaults = {section: dict(values)
+                for section, values in zv0_agent._DEFAULT_CONFIG.items()}
+
+    assert ZV0Agent(str(SHIPPED_CONFIG)).config == defaults
+
+
+def test_yaml_config_loads(tmp_path):
+    pytest.importorskip("yaml")
+    config_path = tmp_path / "zv0.yaml"
+    config_path.write_text("analysis:\n  security_checks: false\n  cache: false\n")
+
+    agent = ZV0Agent(str(config_path))
+
+    assert agent.config == {"analysis": {"security_checks": False, "cache": False}}
+    assert agent.analyzer.security_checks is False
+    assert agent.cache is None
+
+
+@pytest.mark.parametrize("name, text", [
+    ("zv0.yaml", "- analysis\n- cache\n"),
+    ("zv0.toml", 'analysis = "off"\n'),
+])
+def test_malformed_config_loads_defaults(tmp_path, name, text):
+    if name.endswith(".yaml"):
+        pytest.importorskip("yaml")
+    config_path = tmp_path / name
+    config_path.write_text(text)
+
+    agent = ZV0Agent(str(config_path), cache_path=str(tmp_path / "reports.db"))
+
+    assert agent.config is zv0_agent._DEFAULT_CONFIG
+    assert agent.analyzer.security_checks and agent.analyzer.performance_checks
+
+
+def test_analyze_file_honours_coding_cookie(agent, tmp_path):
+    path = tmp_path / "latin.py"
+    path.write_bytes("# -*- coding: latin-1 -*-\nname = 'caf\u00e9'\neval(name)\n".encode("latin-1"))
+
+    result = agent.analyze_file(str(path))
+
+    assert result["success"] is True
+    assert result["data"]["overall_score"] == 95
+    assert result["data"]["issues"] == 1
@@ -0,0 +1,139 @@
+"""Tests for CodeAnalyzer's single-pass walk, metrics and checks."""
+
+import ast
+
+import pytest
+
+import zv0_agent
+from zv0_agent import CodeAnalyzer
+
+
+def analyze(code, analysis_config=None):
+    return CodeAnalyzer(analysis_config).analyze_code(code, "python", "t.py")
+
+
+def test_same_line_issues_in_source_order():
+    report = analyze("eval('1'); exec('2'); open('x')\n")
+    assert [issue.message.split(": ")[1] for issue in report.issues] == ["eval", "exec", "open"]
+
+
+def test_lone_surrogate_gives_error_report():
+    report = analyze("x = '\ud800'\n")
+    assert report.overall_score == 0
+    assert report.issues[0].message.startswith("Analysis error:")
+
+
+def test_str_and_bytes_cached_separately():
+    # The ascii cookie only applies when compiling bytes
+    source = '# coding: ascii\nx = "é"\neval(1)\n'
+    analyzer = CodeAnalyzer()
+
+    as_str = analyzer.analyze_code(source, "python", "t.py")
+    as_bytes = analyzer.analyze_code(source.encode(), "python", "t.py")
+
+    assert as_str.overall_score == 95
+    assert as_bytes.overall_score == 0
+
+
+def loop_issues(code):
+    return [(issue.line_number, issue.message) for issue in analyze(code).issues
+            if issue.category == zv0_agent.Category.PERFORMANCE]
+
+
+def test_sequential_loops_not_flagged():
+    assert loop_issues("for a in x:\n    pass\nfor b in x:\n    pass\n"
+                       "while y:\n    pass\n") == []
+
+
+def test_nested_loops_flagged_at_their_depth():
+    code = ("for a in x:\n"
+            "    for b in x:\n"
+            "        while y:\n"
+            "            for c in x:\n"
+            "                pass\n")
+    assert loop_issues(code) == [(3, "Deeply nested loops (depth 3)"),
+                                 (4, "Deeply nested loops (depth 4)")]
+
+
+def test_def_inside_loops_resets_depth():
+    code = ("for a in x:\n"
+            "    for b in x:\n"
+            "        def f():\n"
+            "            for c in x:\n"
+            "                for d in x:\n"
+            "                    pass\n"
+            "        for e in x:\n"
+            "            pass\n")
+    assert loop_issues(code) == [(7, "Deeply nested loops (depth 3)")]
+
+
+NESTED_SOURCE = ("for a in x:\n"
+                 "    for b in x:\n"
+                 "        for c in x:\n"
+                 "            eval(c)\n")
+
+
+def test_security_checks_off():
+    report = analyze(NESTED_SOURCE, {"security_checks": False})
+
+    assert not [issue for issue in report.issues
+                if issue.category == zv0_agent.Category.SECURITY]
+    assert report.security_score == 100
+    assert (report.complexity_metrics.cyclomatic_complexity
+            == analyze(NESTED_SOURCE).complexity_metrics.cyclomatic_complexity == 4)
+
+
+def test_performance_checks_off():
+    report = analyze(NESTED_SOURCE, {"performance_checks": False})
+
+    assert not [issue for issue in report.issues
+                if issue.category == zv0_agent.Category.PERFORMANCE]
+    assert report.complexity_metrics.cyclomatic_complexity == 4
+
+
+@pytest.mark.parametrize("code, loc, comment_lines", [
+    ("# header\r\rx = 1\r  # note\r", 3, 2),
+    ("# a\r\n\r\nx = 1\r\n\t\x0c\ny = 2", 3, 1),
+    # Only ASCII blanks are indentation, so a line of NBSPs counts as code
+    ('x = """\n\u00a0\n"""\n', 3, 0),
+])
+def test_str_and_bytes_count_lines_alike(code, loc, comment_lines):
+    # A BOM is only valid in bytes; decoding with utf-8-sig drops it from str
+    for source in (code, code.encode(), b"\xef\xbb\xbf" + code.encode()):
+        metrics = analyze(source).complexity_metrics
+        assert metrics.lines_of_code == loc
+        assert metrics.comment_ratio == comment_lines / loc
+
+
+def test_bool_op_adds_a_branch_per_extra_operand():
+    report = analyze("if a and b and c or d:\n    pass\n")
+    assert report.complexity_metrics.cyclomatic_complexity == 5
+
+
+WALK_SOURCES = [
+    NESTED_SOURCE,
+    "@dec(eval)\ndef f(x=open('y')):\n    while x and y or z:\n        exec(x)\n",
+    "class C:\n    def m(self):\n        return [eval(i) for i in x if i or y]\n",
+    "try:\n    pass\nexcept E:\n    for a in x:\n        for b in x:\n            for c in x:\n"
+    "                open(c)\n",
+]
+
+
+@pytest.mark.parametrize("security_checks, performance_checks",
+                         [(True, True), (False, True), (True, False)])
+@pytest.mark.parametrize("code", WALK_SOURCES)
+def test_compiled_walk_matches_visitor(code, security_checks, performance_checks):
+    if zv0_agent._compiled_single_pass is None:
+        pytest.skip("_zv0_metrics is not built")
+    tree = ast.parse(code)
+
+    def flatten(result):
+        complexity, function_count, class_count, issues = result
+        return (complexity, function_count, class_count,
+                [(i.severity, i.line_number, i.message, i.category) for i in issues])
+
+    handlers = zv0_agent._FusedVisitor.dispatch_table(security_checks, performance_checks)
+    compiled = zv0_agent._compiled_single_pass(
+        tree, security_checks, performance_checks,
+        zv0_agent._DANGEROUS, zv0_agent._loop_issue, zv0_agent._call_issue)
+    assert flatten(compiled) == flatten(zv0_agent._FusedVisitor(handlers).run(tree))
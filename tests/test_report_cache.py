@@ -0,0 +1,176 @@
+"""Tests for the on-disk ReportCache used by ZV0Agent.analyze_file."""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import zv0_agent
+from zv0_agent import ZV0Agent
+
+# Big enough to clear _CACHE_MIN_SIZE, with one dangerous call
+SOURCE = "eval('1')\n" + "x = 1\n" * 400
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "reports.db")
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "big.py"
+    path.write_text(SOURCE)
+    return path
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    """Record the paths CodeAnalyzer actually analyzes (cache misses)."""
+    calls = []
+    analyze = zv0_agent.CodeAnalyzer._analyze
+
+    def spy(self, code, language, file_path):
+        calls.append(file_path)
+        return analyze(self, code, language, file_path)
+
+    monkeypatch.setattr(zv0_agent.CodeAnalyzer, "_analyze", spy)
+    return calls
+
+
+def test_locked_database_falls_back_to_analysis(cache_path, source_file, analyses):
+    agent = ZV0Agent(cache_path=cache_path)
+    blocker = sqlite3.connect(cache_path, timeout=0, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+    agent.cache._conn.execute("PRAGMA busy_timeout = 0")
+    try:
+        result = agent.analyze_file(str(source_file))
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+    assert result["success"] is True
+    assert result["data"]["issues"] == 1
+    assert analyses == [str(source_file)]
+
+
+def test_missing_table_falls_back_to_analysis(cache_path, source_file):
+    agent = ZV0Agent(cache_path=cache_path)
+    sqlite3.connect(cache_path, isolation_level=None).execute("DROP TABLE reports")
+
+    result = agent.analyze_file(str(source_file))
+
+    assert result["success"] is True
+    assert result["data"]["issues"] == 1
+
+
+def test_store_failure_keeps_computed_report(cache_path, source_file, monkeypatch):
+    agent = ZV0Agent(cache_path=cache_path)
+
+    def fail(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(agent.cache, "store", fail)
+    result = agent.analyze_file(str(source_file))
+
+    assert result["success"] is True
+    assert result["data"]["issues"] == 1
+
+
+def test_cache_shared_across_threads(cache_path, source_file, analyses):
+    agent = ZV0Agent(cache_path=cache_path)
+    results = []
+
+    def analyze():
+        results.append(agent.analyze_file(str(source_file)))
+
+    # One thread misses and stores; later threads read its row
+    first = threading.Thread(target=analyze)
+    first.start()
+    first.join()
+    threads = [threading.Thread(target=analyze) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [result["success"] for result in results] == [True] * 5
+    assert {result["data"]["issues"] for result in results} == {1}
+    # The worker thread's store landed: a fresh agent hits the database
+    ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    assert analyses == [str(source_file)]
+
+
+def test_miss_stores_and_stat_match_hits(cache_path, source_file, analyses, monkeypatch):
+    first = ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+
+    # An unchanged stat is served without reading the file
+    read_bytes = zv0_agent.Path.read_bytes
+    monkeypatch.setattr(zv0_agent.Path, "read_bytes",
+                        lambda self: pytest.fail(f"read {self}"))
+    second = ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    monkeypatch.setattr(zv0_agent.Path, "read_bytes", read_bytes)
+
+    assert second == first
+    assert analyses == [str(source_file)]
+
+
+def test_digest_match_hits_after_touch(cache_path, source_file, analyses):
+    ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    stat = source_file.stat()
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    result = ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    assert result["data"]["issues"] == 1
+    assert analyses == [str(source_file)]
+
+    # The refreshed stat key now hits without hashing again
+    ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    assert analyses == [str(source_file)]
+
+
+def test_changed_content_misses(cache_path, source_file, analyses):
+    ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    source_file.write_text(SOURCE + "exec('2')\n")
+
+    result = ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    assert result["data"]["issues"] == 2
+    assert analyses == [str(source_file)] * 2
+
+
+def test_small_files_bypass_cache(cache_path, tmp_path, analyses):
+    small = tmp_path / "small.py"
+    small.write_text("eval('1')\n")
+    assert small.stat().st_size < zv0_agent._CACHE_MIN_SIZE
+
+    for _ in range(2):
+        ZV0Agent(cache_path=cache_path).analyze_file(str(small))
+
+    assert analyses == [str(small)] * 2
+    rows = sqlite3.connect(cache_path).execute("SELECT COUNT(*) FROM reports").fetchone()
+    assert rows == (0,)
+
+
+def test_cache_version_bump_invalidates(cache_path, source_file, analyses, monkeypatch):
+    ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    monkeypatch.setattr(zv0_agent, "_CACHE_VERSION", zv0_agent._CACHE_VERSION + 1)
+
+    ZV0Agent(cache_path=cache_path).analyze_file(str(source_file))
+    assert analyses == [str(source_file)] * 2
+
+
+def test_relative_paths_keyed_by_real_path(cache_path, tmp_path, analyses, monkeypatch):
+    for project in ("a", "b"):
+        (tmp_path / project).mkdir()
+        (tmp_path / project / "m.py").write_text(SOURCE + "#" * 10 + project + "\n")
+
+    # The same relative name in two projects keeps two separate rows
+    for _ in range(2):
+        for project in ("a", "b"):
+            monkeypatch.chdir(tmp_path / project)
+            ZV0Agent(cache_path=cache_path).analyze_file("m.py")
+
+    assert analyses == ["m.py"] * 2
+    paths = sqlite3.connect(cache_path).execute("SELECT path FROM reports").fetchall()
+    assert sorted(paths) == [(str((tmp_path / p / "m.py").resolve()),) for p in ("a", "b")]